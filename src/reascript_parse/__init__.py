@@ -1,7 +1,5 @@
 from argparse import ArgumentParser
 
-from . import parse_doc_alt, parse_lua, to_emmy
-
 
 def info(fmt: str, *args):
     print("[INFO] {}".format(fmt.format(*args)))
@@ -43,6 +41,9 @@ def _main() -> int:
         error(f"Action {args.action!r} not yet implemented!")
         return 1
 
+    # deferred so '--help' and argument errors don't pay for importing bs4
+    from . import parse_doc_alt, parse_lua, to_emmy
+
     with open(args.input, "r", encoding="utf8") as f:
         sections = parse_doc_alt.parse(f)
 
@@ -61,10 +62,8 @@ def _main() -> int:
                 "Skipping malformed Lua function in section {!r} - {}", section.name, e
             )
 
-    emmy: str = to_emmy.format(functioncalls)
-
     with open(args.output, "w", encoding="utf8") as f:
-        f.write(emmy)
+        to_emmy.write(functioncalls, f)
 
     info("Lua declaration file saved to: {}", args.output)
 
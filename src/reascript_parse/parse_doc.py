@@ -1,5 +1,7 @@
+import sys
 from collections.abc import Generator
-from typing import Iterable, Literal, NamedTuple, TextIO
+from dataclasses import dataclass
+from typing import ClassVar, Iterable, Literal, NamedTuple, TextIO
 
 import bs4
 
@@ -13,11 +15,16 @@ def _get_text_if_is_section(x: "str | bs4.PageElement"):
     - has no 'href="..."' attribute
     """
 
-    if not isinstance(x, bs4.Tag):
+    # this runs on every body child: tags built by lxml are always exactly
+    # bs4.Tag with an already-lowercase name, so the isinstance MRO walk and
+    # the .lower() call are wasted work
+    if x.__class__ is not bs4.Tag:
         return None
 
-    if x.name.lower() == "a" and "name" in x.attrs and "href" not in x.attrs:
-        return x.attrs["name"]
+    attrs = x.attrs
+    if x.name == "a" and "name" in attrs and "href" not in attrs:
+        # intern the name, it is compared and hashed repeatedly downstream
+        return sys.intern(attrs["name"])
 
     return None
 
@@ -76,7 +83,14 @@ def _split_sections(it: Iterable[bs4.PageElement | str]):
     yield current_section
 
 
-class FunctionCallSection(NamedTuple):
+# frozen slotted dataclasses: attribute access goes straight through slot
+# descriptors instead of NamedTuple's property -> tuple-index indirection
+@dataclass(slots=True, frozen=True)
+class FunctionCallSection:
+    # cheap discriminator, set at class level so hot loops can branch on it
+    # without an isinstance() check
+    IS_FUNC: ClassVar[bool] = True
+
     name: str | None
     c_func: str | None
     e_func: str | None
@@ -85,22 +99,40 @@ class FunctionCallSection(NamedTuple):
     description: str | None
 
 
-class GenericSection(NamedTuple):
+@dataclass(slots=True, frozen=True)
+class GenericSection:
+    IS_FUNC: ClassVar[bool] = False
+
     name: str | None
     description: str | None
 
 
 Section = FunctionCallSection | GenericSection
 
+# maps the classname of a function call definition to the prefix of its text
+_FUNC_PREFIX = {
+    "c_func": "C:",
+    "e_func": "EEL2:",
+    "l_func": "Lua:",
+    "p_func": "Python:",
+}
 
-def _iter_nested_tag_text(tag: bs4.Tag):
-    """Iterate through all text within the given element"""
+# maps the classname of a '*_funcs' block to the language of the function
+# calls nested inside it
+_FUNCS_LANGUAGE: "dict[str, Literal['c', 'eel', 'lua', 'python']]" = {
+    "c_funcs": "c",
+    "e_funcs": "eel",
+    "l_funcs": "lua",
+    "p_funcs": "python",
+}
+
+FUNCS_CLASSES = frozenset(_FUNCS_LANGUAGE)
 
-    for child in tag.children:
-        if isinstance(child, str):
-            yield child
-        else:
-            yield from _iter_nested_tag_text(child)  # type: ignore
+
+def _extract_text(tag: bs4.Tag) -> str:
+    """Extract the text of an element, joining its text nodes with spaces."""
+
+    return tag.get_text(separator=" ").strip()
 
 
 def _parse_function_call_text(prefix: str, tag: bs4.Tag) -> str:
@@ -119,8 +151,7 @@ def _parse_function_call_text(prefix: str, tag: bs4.Tag) -> str:
     ```
     """
 
-    text = " ".join(_iter_nested_tag_text(tag))
-    text = text.strip()
+    text = _extract_text(tag)
 
     if not text.startswith(prefix):
         raise AssertionError(
@@ -160,17 +191,7 @@ def _preprocess_body(it: Iterable[bs4.PageElement | str]):
         if "class" not in child.attrs:
             continue
 
-        classes: list[str] = child.attrs["class"]  # type: ignore
-        if "c_funcs" in classes:
-            funcs_idx = i
-            break
-        elif "e_funcs" in classes:
-            funcs_idx = i
-            break
-        elif "l_funcs" in classes:
-            funcs_idx = i
-            break
-        elif "p_funcs" in classes:
+        if not FUNCS_CLASSES.isdisjoint(child.attrs["class"]):
             funcs_idx = i
             break
 
@@ -189,10 +210,7 @@ def _parse_sections(
     """
 
     for section_name, children in _split_sections(children):
-        c_func: str | None = None
-        e_func: str | None = None
-        l_func: str | None = None
-        p_func: str | None = None
+        funcs: dict[str, str] = {}
         description_parts: list[str] = []
 
         for child in children:
@@ -200,22 +218,15 @@ def _parse_sections(
                 description_parts.append(child)
                 continue
 
-            tagname = child.name.upper()
-
-            if tagname == "DIV" and "class" in child.attrs:
-                classes: list[str] = child.attrs["class"]  # type: ignore
-                if "c_func" in classes:
-                    c_func = _parse_function_call_text("C:", child)
-                    continue
-                elif "e_func" in classes:
-                    e_func = _parse_function_call_text("EEL2:", child)
-                    continue
-                elif "l_func" in classes:
-                    l_func = _parse_function_call_text("Lua:", child)
-                    continue
-                elif "p_func" in classes:
-                    p_func = _parse_function_call_text("Python:", child)
-                    continue
+            if child.name == "div":
+                classes: "list[str] | None" = child.attrs.get("class")  # type: ignore
+                if classes:
+                    classname = next((c for c in classes if c in _FUNC_PREFIX), None)
+                    if classname is not None:
+                        funcs[classname] = _parse_function_call_text(
+                            _FUNC_PREFIX[classname], child
+                        )
+                        continue
 
             description_parts.append(child.text)
 
@@ -223,7 +234,7 @@ def _parse_sections(
         if len(description) == 0:
             description = None
 
-        if c_func is None and e_func is None and l_func is None and p_func is None:
+        if not funcs:
             yield GenericSection(
                 section_name,
                 description,
@@ -231,10 +242,10 @@ def _parse_sections(
         else:
             yield FunctionCallSection(
                 section_name,
-                c_func,
-                e_func,
-                l_func,
-                p_func,
+                funcs.get("c_func"),
+                funcs.get("e_func"),
+                funcs.get("l_func"),
+                funcs.get("p_func"),
                 description,
             )
 
@@ -251,31 +262,21 @@ def _parse_single_language_sections(
     for section_name, children in _split_sections(it):
         description_parts: list[str] = []
 
-        # find index of first <code> element
-        code_idx = None
-        for i, child in enumerate(children):
-            if isinstance(child, str):
-                continue
-
-            if not isinstance(child, bs4.Tag):
-                raise NotImplementedError("what the fuck is this")
-
-            if child.name.lower() != "code":
-                continue
-
-            code_idx = i
-            break
-
-        if code_idx is not None:
-            code_element = children.pop(code_idx)
-            if not isinstance(code_element, bs4.Tag):
-                raise NotImplementedError("what the fuck is this")
+        # the first <code> element contains the function definition
+        code_element = next(
+            (c for c in children if isinstance(c, bs4.Tag) and c.name == "code"),
+            None,
+        )
 
-            functioncall_text = _parse_function_call_text("", code_element)
+        if code_element is not None:
+            functioncall_text = _extract_text(code_element)
         else:
             functioncall_text = None
 
         for child in children:
+            if child is code_element:
+                continue
+
             if isinstance(child, str):
                 description_parts.append(child)
                 continue
@@ -318,8 +319,8 @@ def _parse_single_language_sections(
             )
 
 
-def parse(f: TextIO) -> list[FunctionCallSection]:
-    soup = bs4.BeautifulSoup(f.read(), "html.parser")
+def parse(f: TextIO) -> Generator[FunctionCallSection, None, None]:
+    soup = bs4.BeautifulSoup(f, "lxml")
 
     if soup.body is None:
         raise MalformedDocsException("<body> element is missing from documentation")
@@ -330,10 +331,8 @@ def parse(f: TextIO) -> list[FunctionCallSection]:
     # extras: contains special 'e_funcs', 'l_funcs' elements, they also contain
     #   FunctionCalls, but nested inside an element
 
-    result: list[FunctionCallSection] = []
-
     for section in _parse_sections(children):
-        if isinstance(section, GenericSection):
+        if not section.IS_FUNC:
             # only allow 2 generic sections, all other sections are expected to be function call sections
             assert section.name in (
                 None,
@@ -341,7 +340,7 @@ def parse(f: TextIO) -> list[FunctionCallSection]:
             ), f"unsupported section: {section.name}"
             continue
 
-        result.append(section)
+        yield section
 
     for child in extras:
         if isinstance(child, str):
@@ -350,37 +349,24 @@ def parse(f: TextIO) -> list[FunctionCallSection]:
         if not isinstance(child, bs4.Tag):
             raise NotImplementedError("what the fuck is this")
 
-        if "class" not in child.attrs:
-            continue
-
-        classes: list[str] = child.attrs["class"]  # type: ignore
-        classes = [x for x in classes if x.endswith("_funcs")]
-        is_funcs_block = len(classes) > 0
-        if not is_funcs_block:
+        classes: list[str] = child.attrs.get("class", ())  # type: ignore
+        classname = next((c for c in classes if c in _FUNCS_LANGUAGE), None)
+        if classname is None:
             continue
 
-        if classes[0] == "c_funcs":
-            language = "c"
-        elif classes[0] == "e_funcs":
-            language = "eel"
-        elif classes[0] == "l_funcs":
-            language = "lua"
-        elif classes[0] == "p_funcs":
-            language = "python"
-        else:
-            raise NotImplementedError(f"language not implemented: {language}")
+        language = _FUNCS_LANGUAGE[classname]
 
         for section in _parse_single_language_sections(language, child.children):
-            if isinstance(section, FunctionCallSection):
-                result.append(section)
-
-    return result
+            if section.IS_FUNC:
+                yield section
 
 
 def main():
     from .parse_lua import FunctionCall
 
-    with open("src/reascript_parse/REAPER API functions.html", "r", encoding="utf8") as f:
+    with open(
+        "src/reascript_parse/REAPER API functions.html", "r", encoding="utf8"
+    ) as f:
         sections = parse(f)
 
     result: list[str] = []
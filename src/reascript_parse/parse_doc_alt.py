@@ -1,10 +1,21 @@
+import html
+import mmap
 import re
+import sys
 import textwrap
+from collections.abc import Generator
 from typing import Literal, NamedTuple, TextIO
 
 import bs4
 
-from reascript_parse.parse_doc import FunctionCallSection, _parse_function_call_text
+from reascript_parse.parse_doc import (
+    FunctionCallSection,
+    _extract_text,
+    _parse_function_call_text,
+)
+
+# matches the '<a name="...">' anchors that delimit each section
+_SECTION_RE = re.compile(rb'<a name="([^"]*)">')
 
 
 class RawSection(NamedTuple):
@@ -12,31 +23,33 @@ class RawSection(NamedTuple):
     text: str
 
     @classmethod
-    def parse(cls, f: TextIO) -> list["RawSection"]:
-        text = f.read()
-
-        sections: list[RawSection] = []
+    def parse(cls, f: TextIO) -> Generator["RawSection", None, None]:
+        try:
+            # scan the raw bytes directly instead of materialising the whole
+            # file as a str, sections are only decoded one at a time below
+            buf: "mmap.mmap | bytes" = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            # not backed by a real file (e.g. io.StringIO)
+            buf = f.read().encode("utf8")
 
         prev_span_end = 0
-        prev_contents = None
         prev_section_name = None
 
-        for x in re.finditer(r'<a name="([^"]*?)">', text):
-            section_name = x.group(1)
-            prev_contents = text[prev_span_end : x.start()]
+        for x in _SECTION_RE.finditer(buf):
+            # intern the name, it is compared and hashed repeatedly downstream
+            section_name = sys.intern(x.group(1).decode("utf8"))
 
             # ignore text before the first section in the docs
             if prev_section_name is not None:
-                sections.append(RawSection(prev_section_name, prev_contents))
+                yield cls(
+                    prev_section_name, buf[prev_span_end : x.start()].decode("utf8")
+                )
 
             prev_section_name = section_name
             prev_span_end = x.end()
 
-        prev_contents = text[prev_span_end:]
         if prev_section_name is not None:
-            sections.append(RawSection(prev_section_name, prev_contents))
-
-        return sections
+            yield cls(prev_section_name, buf[prev_span_end:].decode("utf8"))
 
 
 IGNORED_SECTIONS = {
@@ -46,76 +59,142 @@ IGNORED_SECTIONS = {
     "function_list",
 }
 
+# maps a section name's prefix (text before the first '_') to the language of
+# a single-language section, e.g. 'eel_gfx_getchar' => 'eel'
+_LANG_BY_PREFIX: "dict[str, Literal['lua', 'eel', 'python']]" = {
+    "eel": "eel",
+    "lua": "lua",
+    "python": "python",
+}
 
-def pop_from_soup(soup: bs4.BeautifulSoup, search):
-    result = []
-    for element in soup.find_all(search):
-        # remove element
-        result.append(element.extract())
-    return result
 
+# maps the classname of a multilang definition to the prefix of its text
+_MULTILANG_PREFIX = {
+    "c_func": "C:",
+    "e_func": "EEL2:",
+    "l_func": "Lua:",
+    "p_func": "Python:",
+}
 
-MULTILANG_CLASSES = {"c_func", "e_func", "l_func", "p_func"}
+MULTILANG_CLASSES = frozenset(_MULTILANG_PREFIX)
 
+# matches the '<div class="l_func">...</div>' definition blocks of a multilang
+# section (they are never nested)
+_FUNC_DIV_RE = re.compile(r'<div class="([celp]_func)">(.*?)</div>', re.DOTALL)
 
-def parse_multilang_soup(name: str, soup: bs4.BeautifulSoup):
-    def is_multilang_definition(tag: bs4.Tag):
-        if tag.name.lower() != "div":
-            return False
+# matches a single tag, the docs contain stray unescaped '<' characters so
+# this requires the tag to actually look like one
+_TAG_RE = re.compile(r"</?[A-Za-z][^>]*>")
 
-        if "class" not in tag.attrs:
-            return False
 
-        classes: list[str] = tag.attrs["class"]  # type: ignore
-        if len(MULTILANG_CLASSES & set(classes)) == 0:
-            return False
+def _parse_multilang_fast(name: str, text: str):
+    """
+    Attempt to parse a multilang section with regexes alone, skipping DOM
+    construction entirely. The vast majority of sections match the rigid shape
+    this expects; returns None when anything looks unusual so the caller can
+    fall back to the bs4 path.
+    """
 
-        return True
+    if "<h2" in text or "<H2" in text:
+        # sections with headers need the h2-truncation logic
+        return None
 
-    multilang_definitions: list[bs4.Tag] = pop_from_soup(soup, is_multilang_definition)
+    funcs: dict[str, str] = {}
+    spans: list[tuple[int, int]] = []
 
-    c_func: str | None = None
-    e_func: str | None = None
-    l_func: str | None = None
-    p_func: str | None = None
+    for x in _FUNC_DIV_RE.finditer(text):
+        classname = x.group(1)
+        if classname in funcs:
+            # multiple declarations for the same language, let bs4 handle it
+            return None
 
-    for tag in multilang_definitions:
-        classes: list[str] = tag.attrs["class"]  # type: ignore
-        classname = [c for c in classes if c in MULTILANG_CLASSES][0]
-
-        if classname == "c_func":
-            assert (
-                c_func is None
-            ), f"multiple declarations for the same language in section {name!r}"
-            c_func = _parse_function_call_text("C:", tag)
-        elif classname == "e_func":
-            assert (
-                e_func is None
-            ), f"multiple declarations for the same language in section {name!r}"
-            e_func = _parse_function_call_text("EEL2:", tag)
-        elif classname == "l_func":
-            assert (
-                l_func is None
-            ), f"multiple declarations for the same language in section {name!r}"
-            l_func = _parse_function_call_text("Lua:", tag)
-        elif classname == "p_func":
-            assert (
-                p_func is None
-            ), f"multiple declarations for the same language in section {name!r}"
-            p_func = _parse_function_call_text("Python:", tag)
-        else:
-            raise NotImplementedError(f"unknown classname {classname}")
+        # equivalent to _parse_function_call_text: join the text nodes of the
+        # definition block with spaces, then strip the language prefix
+        parts = [s for s in _TAG_RE.split(x.group(2)) if s]
+        functioncall_text = html.unescape(" ".join(parts)).strip()
 
-    description = soup.text.strip()
+        prefix = _MULTILANG_PREFIX[classname]
+        if not functioncall_text.startswith(prefix):
+            return None
+
+        funcs[classname] = functioncall_text[len(prefix) :].strip()
+        spans.append(x.span())
+
+    if not funcs:
+        return None
+
+    # everything outside the definition blocks is the description
+    rest: list[str] = []
+    prev_end = 0
+    for start, end in spans:
+        rest.append(text[prev_end:start])
+        prev_end = end
+    rest.append(text[prev_end:])
+
+    parts = [s for s in _TAG_RE.split("".join(rest)) if s]
+    description = html.unescape("".join(parts)).strip()
+    # add extra newline between each line
+    description = description.replace("\n", "\n\n")
+
+    return FunctionCallSection(
+        name,
+        funcs.get("c_func"),
+        funcs.get("e_func"),
+        funcs.get("l_func"),
+        funcs.get("p_func"),
+        description or None,
+    )
+
+
+def parse_multilang_soup(name: str, soup: bs4.BeautifulSoup):
+    funcs: dict[str, str] = {}
+    description_parts: list[str] = []
+
+    # a single walk over the tree: pick out the multilang definition divs
+    # (skipping their subtrees) and accumulate everything else as description
+    # text, instead of extracting the divs and re-walking for soup.text
+    def walk(tag: bs4.Tag):
+        for child in tag.children:
+            if isinstance(child, str):
+                description_parts.append(child)
+                continue
+
+            if not isinstance(child, bs4.Tag):
+                raise NotImplementedError("what the fuck is this")
+
+            classes: "list[str] | None" = child.attrs.get("class")  # type: ignore
+            if child.name == "div" and classes:
+                classname = next((c for c in classes if c in MULTILANG_CLASSES), None)
+                if classname is not None:
+                    assert (
+                        classname not in funcs
+                    ), f"multiple declarations for the same language in section {name!r}"
+                    funcs[classname] = _parse_function_call_text(
+                        _MULTILANG_PREFIX[classname], child
+                    )
+                    continue
+
+            walk(child)
+
+    walk(soup)
+
+    description = "".join(description_parts).strip()
     # add extra newline between each line
     description = description.replace("\n", "\n\n")
     if not description:
         description = None
 
-    if c_func is None and e_func is None and l_func is None and p_func is None:
+    if not funcs:
         raise ValueError("failed to find function definition in multilang section")
 
-    return FunctionCallSection(name, c_func, e_func, l_func, p_func, description)
+    return FunctionCallSection(
+        name,
+        funcs.get("c_func"),
+        funcs.get("e_func"),
+        funcs.get("l_func"),
+        funcs.get("p_func"),
+        description,
+    )
 
 
 def remove_elements_before(ptr: bs4.Tag):
@@ -123,15 +202,10 @@ def remove_elements_before(ptr: bs4.Tag):
 
     parent = ptr.parent
     while parent is not None:
-        # remove each child up to the pointer
-        for child in list(parent.children):
-            if child is ptr:
-                break
-            child.extract()
-        else:
-            # we never reached the pointer, something has gone horribly wrong
-            # this should never be reached (unless my logic is wrong)
-            assert False
+        # unlink each sibling before the pointer, no need to rebuild the
+        # parent's child list just to find the pointer
+        while ptr.previous_sibling is not None:
+            ptr.previous_sibling.extract()
 
         # navigate to 1 level up
         ptr = parent
@@ -143,17 +217,10 @@ def remove_elements_after(ptr: bs4.Tag):
 
     parent = ptr.parent
     while parent is not None:
-        # remove each child up to the pointer
-        children = list(parent.children)
-        children.reverse()
-        for child in children:
-            if child is ptr:
-                break
-            child.extract()
-        else:
-            # we never reached the pointer, something has gone horribly wrong
-            # this should never be reached (unless my logic is wrong)
-            assert False
+        # unlink each sibling after the pointer, no need to rebuild the
+        # parent's child list just to find the pointer
+        while ptr.next_sibling is not None:
+            ptr.next_sibling.extract()
 
         # navigate to 1 level up
         ptr = parent
@@ -177,7 +244,7 @@ def parse_singlelang_soup(
     # finally, remove the function definition itself from the tree
     func.extract()
 
-    func_text = _parse_function_call_text("", func)
+    func_text = _extract_text(func)
 
     # now, the tree is left with nothing but the description (hopefully)
     description = soup.text.strip()
@@ -212,16 +279,15 @@ def parse(f: TextIO) -> list[FunctionCallSection]:
         if section.name in IGNORED_SECTIONS:
             continue
 
-        if section.name.startswith("eel_"):
-            single_language = "eel"
-        elif section.name.startswith("lua_"):
-            single_language = "lua"
-        elif section.name.startswith("python_"):
-            single_language = "python"
-        else:
-            single_language = None
+        single_language = _LANG_BY_PREFIX.get(section.name.partition("_")[0])
+
+        if single_language is None:
+            fc = _parse_multilang_fast(section.name, section.text)
+            if fc is not None:
+                result.append(fc)
+                continue
 
-        soup = bs4.BeautifulSoup(section.text, "html.parser")
+        soup = bs4.BeautifulSoup(section.text, "lxml")
 
         # remove <h2> headers and everything after them
         h2 = soup.find("h2")
@@ -1,4 +1,5 @@
-import re
+import sys
+from functools import lru_cache
 from typing import NamedTuple, Optional
 
 KNOWN_TYPES = frozenset(
@@ -14,6 +15,17 @@ KNOWN_TYPES = frozenset(
 
 LUA_KEYWORDS = frozenset(["end", "in", "for", "repeat"])
 
+# maps invalid identifier characters to underscores '_', covers Latin-1 only
+# so the rare non-Latin-1 character falls back to a per-character scrub
+_SANITIZE_TABLE = str.maketrans(
+    {c: "_" for c in map(chr, range(256)) if not (c.isalnum() or c == "_")}
+)
+
+# param/retval strings repeat heavily across the docs, cache their parsed
+# forms so repeats are a single dict lookup (instances are immutable)
+_RETVAL_CACHE: dict = {}
+_PARAM_CACHE: dict = {}
+
 
 class ParseError(Exception):
     def __init__(self, source_text: str, msg: str) -> None:
@@ -33,11 +45,15 @@ class RetVal(NamedTuple):
     def parse(cls, text: str):
         """Parse text like 'boolean retval' into a RetVal"""
 
-        parts = [x for x in text.split()]
+        cached = _RETVAL_CACHE.get(text)
+        if cached is not None:
+            return cached
+
+        parts = text.split()
 
         if len(parts) == 3 and parts[0] == "optional":
             optional = True
-            parts.pop(0)
+            parts = parts[1:]
         else:
             optional = False
 
@@ -45,19 +61,22 @@ class RetVal(NamedTuple):
             # Format: <TYPE> <NAME>
             # ' MediaItem item '
             type, name = parts
-            return cls(type, name, optional)
         elif len(parts) == 1 and parts[0] in KNOWN_TYPES:
             type = parts[0]
             name = parts[0][:3].lower()
-            return cls(type, name, optional)
         else:
             raise ParseError(text, "malformed return value")
 
+        # intern the tokens, they are drawn from a small shared vocabulary
+        result = _RETVAL_CACHE[text] = cls(sys.intern(type), sys.intern(name), optional)
+        return result
+
     def __str__(self) -> str:
+        text = self.type + " " + (self.name or "_")
         if self.optional:
-            return f"optional {self.type} {self.name or '_'}"
+            return "optional " + text
         else:
-            return f"{self.type} {self.name or '_'}"
+            return text
 
 
 class FuncParam(NamedTuple):
@@ -71,11 +90,15 @@ class FuncParam(NamedTuple):
     def parse(cls, text: str):
         """Parse text like 'ImGui_Context ctx' into a FuncParam"""
 
-        parts = [x for x in text.split()]
+        cached = _PARAM_CACHE.get(text)
+        if cached is not None:
+            return cached
+
+        parts = text.split()
 
         if parts[0] == "optional":
             optional = True
-            parts.pop(0)
+            parts = parts[1:]
         else:
             optional = False
 
@@ -87,13 +110,16 @@ class FuncParam(NamedTuple):
         else:
             raise ParseError(text, "malformed function parameter")
 
-        return cls(type, name, optional)
+        # intern the tokens, they are drawn from a small shared vocabulary
+        result = _PARAM_CACHE[text] = cls(sys.intern(type), sys.intern(name), optional)
+        return result
 
     def __str__(self) -> str:
+        text = self.type + " " + (self.name or "_")
         if self.optional:
-            return f"optional {self.type} {self.name or '_'}"
+            return "optional " + text
         else:
-            return f"{self.type} {self.name or '_'}"
+            return text
 
 
 class FunctionCall(NamedTuple):
@@ -111,31 +137,39 @@ class FunctionCall(NamedTuple):
         if self.varargs:
             params += ", ..."
 
+        call = self.namespace + "." + self.name + "(" + params + ")"
+
         if self.retvals:
-            retvals = ", ".join(str(x) for x in self.retvals)
-            return f"{retvals} = {self.namespace}.{self.name}({params})"
+            return ", ".join(str(x) for x in self.retvals) + " = " + call
         else:
-            return f"{self.namespace}.{self.name}({params})"
+            return call
 
     @classmethod
     def parse(cls, text: str):
+        # identical signatures repeat across a doc (and across doc versions),
+        # the result is immutable so parsing each unique text once is safe
+        return cls._parse_impl(text)
+
+    @staticmethod
+    @lru_cache(maxsize=16384)
+    def _parse_impl(text: str):
         # determine if functioncall has an assignment, "... = ..."
-        _ = text.split("=")
-        if not 1 <= len(_) <= 2:
-            raise ParseError(text, "malformed functioncall content")
+        _ = text.split("=", 1)
 
         # last part must be function call
         call = _[-1].strip()
         # first part is optional, has return values
         retvals = _[0] if len(_) == 2 else None
 
-        # find the parameters for this functioncall
-        params_match = re.search(r"\(([A-Za-z0-9 _.,\n]*)\)", call)
-        if params_match is None:
+        # find the parameters for this functioncall, i.e. the region between
+        # the first '(' and the last ')'
+        params_start = call.find("(")
+        params_end = call.rfind(")")
+        if params_start == -1 or params_end < params_start:
             raise ParseError(text, "failed to find params")
 
         # parse the parameters into objects
-        params_str = params_match.group(1).strip()
+        params_str = call[params_start + 1 : params_end].strip()
         if params_str.endswith("..."):
             # handle varargs
             params_str = params_str[: -len("...")]
@@ -156,7 +190,7 @@ class FunctionCall(NamedTuple):
         # determine the name and return values of this functioncall
         # handled differently depending on if there is an assignment, "... = ..."
         if retvals is not None:
-            functionname = call[: params_match.start()]
+            functionname = call[:params_start]
 
             try:
                 retvals = [RetVal.parse(x) for x in retvals.split(",")]
@@ -167,7 +201,7 @@ class FunctionCall(NamedTuple):
             # no assignment expression '='
             # but it might still have a return value, specified as:
             #      <TYPE> <NAME>(<PARAMS>)
-            _ = call[: params_match.start()].split()
+            _ = call[:params_start].split()
             if len(_) == 1:
                 # no return value, just the function name
                 functionname = _[0]
@@ -179,18 +213,20 @@ class FunctionCall(NamedTuple):
             else:
                 raise ParseError(text, "malformed functioncall signature")
 
-        _ = functionname.rsplit(".", maxsplit=1)
-        if len(_) != 2:
+        namespace, sep, functionname = functionname.rpartition(".")
+        if not sep:
             raise ParseError(text, "failed to parse namespace")
-
-        namespace, functionname = _
         if namespace.startswith("{") and namespace.endswith("}"):
             namespace = namespace[1:-1]
             is_class_method = True
         else:
             is_class_method = False
 
-        return cls(
+        # intern so the handful of namespaces share one object downstream
+        namespace = sys.intern(namespace)
+        functionname = sys.intern(functionname)
+
+        return FunctionCall(
             functionname,
             namespace,
             params,
@@ -200,12 +236,20 @@ class FunctionCall(NamedTuple):
         ).sanitize()
 
     @staticmethod
+    @lru_cache(maxsize=4096)
     def _sanitize_identifier(name: str):
+        # fast path: most names are already valid identifiers
+        if name.isidentifier() and name not in LUA_KEYWORDS:
+            return name
+
         # replace invalid identifier characters with underscores '_'
-        name = re.sub(r"[^\w]", "_", name)
+        name = name.translate(_SANITIZE_TABLE)
+        if not name.isascii():
+            # the table only covers Latin-1, scrub whatever it let through
+            name = "".join(c if (c.isalnum() or c == "_") else "_" for c in name)
         # disallow keywords as names
         if name in LUA_KEYWORDS:
-            name = f"_{name}"
+            name = "_" + name
         return name
 
     def sanitize(self):
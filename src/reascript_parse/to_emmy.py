@@ -1,10 +1,15 @@
-import textwrap
-from typing import Iterable, NamedTuple
+import io
+import re
+from collections import defaultdict
+from typing import Iterable, NamedTuple, TextIO
 
 from reascript_parse.parse_doc import FunctionCallSection
 
 from .parse_lua import FunctionCall
 
+# case-insensitive search beats lowercasing a copy of the whole description
+_DEPRECATED_RE = re.compile(r"deprecated", re.IGNORECASE)
+
 
 class AnnotatedFunctionCall(NamedTuple):
     """Wrapper around FunctionCall with additional fields for documentation"""
@@ -15,10 +20,8 @@ class AnnotatedFunctionCall(NamedTuple):
 
     @classmethod
     def from_section(cls, call: FunctionCall, section: FunctionCallSection):
-        deprecated = (
-            "deprecated" in section.description.lower()
-            if section.description
-            else False
+        deprecated = bool(
+            section.description and _DEPRECATED_RE.search(section.description)
         )
         return cls(call, section.description, deprecated=deprecated)
 
@@ -34,27 +37,22 @@ class AnnotatedFunctionCall(NamedTuple):
                 f"@param {param.name}{'?' if param.optional else ''} {param.type}"
             )
 
-        if len(self.function_call.retvals) > 0:
+        if self.function_call.retvals:
             parts.append(
                 f"@return {', '.join([rv.type for rv in self.function_call.retvals])}"
             )
 
         if self.deprecated:
-            parts.append(f"@deprecated")
+            parts.append("@deprecated")
 
-        docstring = "\n".join(
-            (
-                textwrap.indent(x, "---", lambda _: True)
-                if x.startswith("@")
-                else textwrap.indent(x, "--- ", lambda _: True)
-            )
-            for x in parts
-        )
+        # prefix each line and trim trailing whitespace in a single pass
+        lines: list[str] = []
+        for x in parts:
+            prefix = "---" if x.startswith("@") else "--- "
+            for line in x.split("\n"):
+                lines.append((prefix + line).rstrip())
 
-        # trim trailing whitespaces from docstring
-        docstring = "\n".join([l.rstrip() for l in docstring.splitlines()])
-
-        return docstring
+        return "\n".join(lines)
 
     def format(self):
         """
@@ -74,7 +72,7 @@ class AnnotatedFunctionCall(NamedTuple):
         params = ", ".join([p.name for p in self.function_call.params])
         declaration = f"{self.function_call.name} = function({params}) end,"
 
-        return f"{docstring}\n{declaration}"
+        return docstring + "\n" + declaration
 
     def format_method(self, variable: str):
         docstring = self.docstring()
@@ -82,7 +80,7 @@ class AnnotatedFunctionCall(NamedTuple):
         params = ", ".join([p.name for p in self.function_call.params])
         declaration = f"function {variable}:{self.function_call.name}({params}) end"
 
-        return f"{docstring}\n{declaration}"
+        return docstring + "\n" + declaration
 
 
 def _declare_types(types: Iterable[str]):
@@ -106,11 +104,13 @@ def _declare_types(types: Iterable[str]):
     ```
     """
 
-    docstring = "\n".join([f"---@class {t}" for t in types])
-    return f"{docstring}\nlocal _ = {{}}"
+    docstring = "\n".join(["---@class " + t for t in types])
+    return docstring + "\nlocal _ = {}"
 
 
-def _declare_class_methods(annotated_functions: Iterable[AnnotatedFunctionCall]):
+def _declare_class_methods(
+    namespace: str, annotated_functions: Iterable[AnnotatedFunctionCall]
+):
     # validation
     for afc in annotated_functions:
         if not afc.function_call.is_class_method:
@@ -118,17 +118,6 @@ def _declare_class_methods(annotated_functions: Iterable[AnnotatedFunctionCall])
                 f"attempted to declare non-class-method as class method: {afc}"
             )
 
-    unique_namespaces = set(
-        [afc.function_call.namespace for afc in annotated_functions]
-    )
-    if len(unique_namespaces) == 0:
-        raise ValueError("no functions given")
-    if len(unique_namespaces) > 1:
-        raise ValueError(
-            "given functions belong to various namespaces, this function can only process one namespace at a time"
-        )
-    namespace = unique_namespaces.pop()
-
     parts: list[str] = []
 
     parts.append(f"---@class {namespace}\nlocal _ = {{}}")
@@ -160,50 +149,52 @@ PREAMBLE = """\
 ---@diagnostic disable: missing-return"""
 
 
-def format(functions: Iterable[AnnotatedFunctionCall]):
-    result: list[str] = [PREAMBLE]
+def write(functions: Iterable[AnnotatedFunctionCall], fp: TextIO):
+    """
+    Serialise the given functions to a file object, writing each declaration
+    as it is generated instead of building the whole file in memory.
+    """
 
-    # find types that we need to declare
+    # a single pass collects the types we need to declare and groups the
+    # functions by namespace, so 'functions' can be any iterable
     unknown_types: set[str] = set()
+    namespaces: dict[str, list[AnnotatedFunctionCall]] = defaultdict(list)
     for fc in functions:
-        for p in fc.function_call.params:
-            unknown_types.add(p.type)
-        for rv in fc.function_call.retvals:
-            unknown_types.add(rv.type)
-    unknown_types = unknown_types - KNOWN_TYPES
+        call = fc.function_call
+        unknown_types.update(p.type for p in call.params)
+        unknown_types.update(rv.type for rv in call.retvals)
+        namespaces[call.namespace].append(fc)
 
-    result.append(_declare_types(sorted(unknown_types)))
+    fp.write(PREAMBLE)
 
-    # group functions by their namespace
-    namespaces: dict[str, list[AnnotatedFunctionCall]] = {}
-    for fc in functions:
-        if fc.function_call.namespace not in namespaces:
-            namespaces[fc.function_call.namespace] = []
-
-        namespaces[fc.function_call.namespace].append(fc)
+    fp.write("\n\n")
+    fp.write(_declare_types(sorted(t for t in unknown_types if t not in KNOWN_TYPES)))
 
     # serialise each namespace (and its functions)
-    for namespace, functions in namespaces.items():
-        is_class_namespace = functions[0].function_call.is_class_method
+    for namespace, group in namespaces.items():
+        fp.write("\n\n")
+
+        is_class_namespace = group[0].function_call.is_class_method
         if is_class_namespace:
             # serialise functions
-            emmy_functions = _declare_class_methods(functions)
-            result.append(emmy_functions)
+            fp.write(_declare_class_methods(namespace, group))
         else:
-            # serialise functions
-            emmy_functions = [fc.format() for fc in functions]
-
-            parts = []
-            if namespace[0] == namespace[0].lower():
+            # serialise functions, writing each one as it is formatted instead
+            # of joining and re-indenting the whole namespace in memory
+            if namespace[0].islower():
                 # namespace starts with lowercase letter
-                parts.append("---@diagnostic disable-next-line: lowercase-global")
-            parts.extend(
-                [
-                    f"{namespace} = {{",
-                    textwrap.indent("\n\n".join(emmy_functions), "    "),
-                    "}",
-                ]
-            )
-            result.append("\n".join(parts))
+                fp.write("---@diagnostic disable-next-line: lowercase-global\n")
+            fp.write(namespace + " = {\n")
+            for i, fc in enumerate(group):
+                if i:
+                    fp.write("\n\n")
+                # formatted functions contain no blank lines, so this is
+                # equivalent to textwrap.indent without its per-line regex
+                fp.write("    " + fc.format().replace("\n", "\n    "))
+            fp.write("\n}")
 
-    return "\n\n".join(result)
+
+def format(functions: Iterable[AnnotatedFunctionCall]):
+    buf = io.StringIO()
+    write(functions, buf)
+    return buf.getvalue()